@@ -1,3 +1,4 @@
+import itertools
 import networkx as nx
 import sympy as sp
 from collections import deque
@@ -7,6 +8,24 @@ logger = logging.getLogger(__name__)
 
 import networkx as nx
 
+def _multi_source_ancestors(graph, sources):
+    """
+    Ancestors of all 'sources' (sources included), computed with a single
+    multi-source BFS over the reversed adjacency instead of one
+    nx.ancestors() traversal per source.
+    """
+    visited = set(sources)
+    q = deque(sources)
+    pred = graph.pred  # dict-of-dicts; avoids per-node generator overhead
+    while q:
+        n = q.popleft()
+        for p in pred[n]:
+            if p not in visited:
+                visited.add(p)
+                q.append(p)
+    return visited
+
+
 def is_d_separated(graph: nx.DiGraph, start, end, conditioned_set):
     """
     Returns True iff start ⟂ end | conditioned_set in the DAG 'graph'
@@ -21,40 +40,117 @@ def is_d_separated(graph: nx.DiGraph, start, end, conditioned_set):
 
     nodes_of_interest = {start, end} | Z
 
-    anc = set(nodes_of_interest)
-    for n in nodes_of_interest:
-        anc |= nx.ancestors(graph, n)
+    anc = _multi_source_ancestors(graph, nodes_of_interest)
 
-    G_anc = graph.subgraph(anc).copy()
+    # Read-only SubGraph view; never mutated below, so no .copy() needed.
+    G_anc = graph.subgraph(anc)
 
     moral = nx.Graph()
     moral.add_nodes_from(G_anc.nodes())
     moral.add_edges_from(G_anc.edges())  # skeleton
 
-    for child in G_anc.nodes():
-        parents = list(G_anc.predecessors(child))
-        for i in range(len(parents)):
-            for j in range(i + 1, len(parents)):
-                moral.add_edge(parents[i], parents[j])
+    # marry parents of each common child
+    for preds in G_anc.pred.values():
+        if len(preds) > 1:
+            moral.add_edges_from(itertools.combinations(preds, 2))
 
-    moral.remove_nodes_from([z for z in Z if z in moral])
+    moral.remove_nodes_from(Z & moral.nodes)
 
     if start not in moral or end not in moral:
         return True
 
     return not nx.has_path(moral, start, end)
 
-def has_descendant_in_set(graph, node, conditioned_set, visited=None):
-    if visited is None:
-        visited = set()
-    if node in visited:
-        return False
-    visited.add(node)
-    for child in graph.successors(node):
-        if child in conditioned_set:
-            return True
-        if has_descendant_in_set(graph, child, conditioned_set, visited):
-            return True
+def _build_dsep_index(graph):
+    """
+    Integer-indexed predecessor adjacency for _dsep_indexed.
+    Built once per (modified) graph by callers that issue many
+    d-separation queries against the same structure.
+    """
+    node_ix = {n: i for i, n in enumerate(graph.nodes())}
+    preds = [[node_ix[p] for p in graph.pred[n]] for n in node_ix]
+    return node_ix, preds
+
+
+def _dsep_indexed(preds, start_ix, end_ix, z_mask):
+    """
+    Same algorithm as is_d_separated (ancestral set + moralization +
+    undirected separation) but over bitmask node sets (bit i set iff node
+    i is a member) — the hot-loop form used during proof search on a
+    fixed causal structure. Causal graphs here are small, so every set
+    fits in one Python int and membership/union are single bitwise ops.
+    """
+    n = len(preds)
+
+    # multi-source ancestors of {start, end} | Z
+    anc = (1 << start_ix) | (1 << end_ix) | z_mask
+    q = [v for v in range(n) if (anc >> v) & 1]
+    while q:
+        v = q.pop()
+        for p in preds[v]:
+            bit = 1 << p
+            if not anc & bit:
+                anc |= bit
+                q.append(p)
+
+    live = anc & ~z_mask
+    if not (live >> start_ix) & 1 or not (live >> end_ix) & 1:
+        return True
+
+    # moralized undirected adjacency over the ancestral set, Z removed.
+    # Parents are married even when the child is conditioned on (collider).
+    adj = [0] * n
+    for v in range(n):
+        if not (anc >> v) & 1:
+            continue
+        ps = [p for p in preds[v] if (anc >> p) & 1]
+        if (live >> v) & 1:
+            for p in ps:
+                if (live >> p) & 1:
+                    adj[v] |= 1 << p
+                    adj[p] |= 1 << v
+        for a, b in itertools.combinations(ps, 2):
+            if (live >> a) & 1 and (live >> b) & 1:
+                adj[a] |= 1 << b
+                adj[b] |= 1 << a
+
+    # frontier-based undirected reachability on the bitmasks
+    end_bit = 1 << end_ix
+    visited = 1 << start_ix
+    frontier = visited
+    while frontier:
+        reach = 0
+        f = frontier
+        v = 0
+        while f:
+            if f & 1:
+                reach |= adj[v]
+            f >>= 1
+            v += 1
+        if reach & end_bit:
+            return False
+        frontier = reach & ~visited
+        visited |= reach
+    return True
+
+
+def has_descendant_in_set(graph, node, conditioned_set):
+    """
+    True iff some (strict or equal) descendant reached from 'node' lies in
+    conditioned_set. Iterative BFS — no Python frame per node, no
+    recursion-limit issues on deep DAGs.
+    """
+    visited = {node}
+    q = deque((node,))
+    succ = graph.succ  # dict-of-dicts
+    while q:
+        n = q.popleft()
+        for child in succ[n]:
+            if child in conditioned_set:
+                return True
+            if child not in visited:
+                visited.add(child)
+                q.append(child)
     return False
 
 
@@ -63,11 +159,20 @@ class CausalExpr:
     """
     Represents a causal expression with associated causal graph.
     """
-    def __init__(self, expression, causal_structure=None):
+    def __init__(self, expression, causal_structure=None, graph=None,
+                 graph_cache=None, dsep_cache=None, index_cache=None,
+                 desc_cache=None):
         self.expression = expression
         self.causal_structure = causal_structure
-        self.graph = self._build_graph()
-    
+        # An already-built graph (plus shared caches) can be supplied by
+        # callers like CausalProofFinder that create many CausalExpr
+        # instances over the same fixed causal structure.
+        self.graph = graph if graph is not None else self._build_graph()
+        self._graph_cache = graph_cache
+        self._dsep_cache = dsep_cache
+        self._index_cache = index_cache if index_cache is not None else {}
+        self._desc_cache = desc_cache if desc_cache is not None else {}
+
     def _build_graph(self):
         """
         Build a directed graph from the causal structure.
@@ -85,12 +190,11 @@ class CausalExpr:
                 for child in children:
                     G.add_edge(str(parent), str(child))
             
-            try:
-                cycles = list(nx.simple_cycles(G))
-                if cycles:
-                    logger.warning(f"Warning: The graph contains cycles: {cycles}")
-            except Exception as e:
-                logger.error(f"Error checking for cycles: {e}")
+            # Linear-time DAG check; enumerating the actual cycles
+            # (nx.simple_cycles) is exponential in the worst case and only
+            # needed when a caller wants to repair them.
+            if not nx.is_directed_acyclic_graph(G):
+                logger.warning("Warning: The graph contains cycles")
         
         return G
     
@@ -108,69 +212,99 @@ class CausalExpr:
             graph = self.graph
             
         g_copy = graph.copy()
-        
-        max_iterations = 100  
-        iteration = 0
-        
-        while iteration < max_iterations:
+
+        # Break every non-trivial SCC in one condensation pass (remove one
+        # intra-SCC edge each), repeating only in the rare case a removal
+        # leaves a smaller cycle — instead of one O(V+E) find_cycle per
+        # removed edge.
+        max_rounds = 100
+        for _ in range(max_rounds):
             if nx.is_directed_acyclic_graph(g_copy):
-                break
-                
-            try:
-                cycle = nx.find_cycle(g_copy)
-                if not cycle:
-                    break
-                g_copy.remove_edge(*cycle[-1])
-                iteration += 1
-            except nx.NetworkXNoCycle:
-                break
-            except Exception as e:
-                logger.error(f"Error making graph acyclic: {e}")
-                break
-        
-        if iteration >= max_iterations:
-            logger.warning("Reached maximum iterations trying to make graph acyclic")
-            
+                return g_copy
+
+            for scc in nx.strongly_connected_components(g_copy):
+                if len(scc) > 1:
+                    sub = g_copy.subgraph(scc)
+                    u, v = next(iter(sub.edges()))
+                    g_copy.remove_edge(u, v)
+                else:
+                    (n,) = scc
+                    if g_copy.has_edge(n, n):
+                        g_copy.remove_edge(n, n)
+
+        logger.warning("Reached maximum iterations trying to make graph acyclic")
         return g_copy
     
-    def _custom_d_separation(self, X, Y, Z, graph=None):
+    def _custom_d_separation(self, X, Y, Z, graph=None, graph_key=None):
         if graph is None:
             graph = self.graph
-        return is_d_separated(graph, str(X), str(Y), set(str(z) for z in Z))
 
-        
-    def _get_moral_graph(self, graph):
+        # accept pre-stringified args / pre-built sets from hot callers
+        # without re-wrapping them
+        X_str = X if isinstance(X, str) else str(X)
+        Y_str = Y if isinstance(Y, str) else str(Y)
+        Z_strs = Z if isinstance(Z, frozenset) else frozenset(str(z) for z in Z)
+
+        if graph_key is None:
+            return is_d_separated(graph, X_str, Y_str, Z_strs)
+
+        if self._dsep_cache is not None:
+            key = (graph_key, X_str, Y_str, Z_strs)
+            hit = self._dsep_cache.get(key)
+            if hit is not None:
+                return hit
+
+        result = self._dsep_via_index(graph, graph_key, X_str, Y_str, Z_strs)
+
+        if self._dsep_cache is not None:
+            self._dsep_cache[key] = result
+        return result
+
+    def _descendants(self, graph, graph_key, node):
         """
-        Create a moral graph from a DAG (connect parents of common children).
-        This is a key step in checking d-separation.
+        nx.descendants with a (graph_key, node) cache — the barred graphs
+        rule 3 queries recur across BFS states on a fixed structure.
         """
-        moral = nx.Graph()
-        
-        for node in graph.nodes():
-            moral.add_node(node)
-        
-        for u, v in graph.edges():
-            moral.add_edge(u, v)
-        
-        for node in graph.nodes():
-            parents = list(graph.predecessors(node))
-            for i in range(len(parents)):
-                for j in range(i+1, len(parents)):
-                    moral.add_edge(parents[i], parents[j])
-        
-        return moral
-    
+        key = (graph_key, node)
+        hit = self._desc_cache.get(key)
+        if hit is None:
+            hit = nx.descendants(graph, node)
+            self._desc_cache[key] = hit
+        return hit
+
+    def _dsep_via_index(self, graph, graph_key, X_str, Y_str, Z_strs):
+        """
+        Run the integer d-separation kernel, encoding the graph once per
+        graph_key (e.g. rule 1 queries the same barred graph for every
+        candidate W).
+        """
+        index = self._index_cache.get(graph_key)
+        if index is None:
+            index = _build_dsep_index(graph)
+            self._index_cache[graph_key] = index
+        node_ix, preds = index
+
+        if X_str == Y_str:
+            return False
+        if X_str not in node_ix or Y_str not in node_ix:
+            return True
+
+        # missing Z nodes raise KeyError, matching is_d_separated's
+        # behavior of surfacing unknown conditioning variables
+        z_mask = 0
+        for z in Z_strs:
+            z_mask |= 1 << node_ix[z]
+        return _dsep_indexed(preds, node_ix[X_str], node_ix[Y_str], z_mask)
+
+
     def _is_d_separated(self, X, Y, Z):
         """
         Check if X and Y are d-separated by Z in the causal graph.
         Returns True if they are d-separated, False otherwise.
         """
         try:
-            X_str = str(X)
-            Y_str = str(Y)
-            Z_strs = [str(z) for z in Z]
-            
-            return self._custom_d_separation(X_str, Y_str, set(Z_strs))
+            return self._custom_d_separation(
+                str(X), str(Y), frozenset(str(z) for z in Z))
         except Exception as e:
             logger.error(f"Error in d-separation check: {e}")
             return False
@@ -180,61 +314,107 @@ class CausalExpr:
         Create a modified graph where incoming edges to intervention variables are removed.
         This is G_X for do(X).
         """
+        cache_key = None
+        if self._graph_cache is not None:
+            cache_key = ("bar", frozenset(str(X) for X in do_vars))
+            cached = self._graph_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         g_modified = self.graph.copy()
-        
+
         for X in do_vars:
-            incoming_edges = [(u, v) for u, v in g_modified.edges() if v == str(X)]
-            g_modified.remove_edges_from(incoming_edges)
-        
+            g_modified.remove_edges_from(list(g_modified.in_edges(str(X))))
+
+        if cache_key is not None:
+            self._graph_cache[cache_key] = g_modified
         return g_modified
     
-    def apply_rule_1_all(self):
+    def _partition_conditions(self):
         """
-        Enumerate all one-step Rule 1 rewrites:
-
-        P(Y | do(X), Z, W) = P(Y | do(X), Z)
-        if Y ⟂ W | X, Z in G_{\bar X}
-
-        Returns a list of all distinct expressions obtainable by dropping
-        exactly one observed condition W that satisfies the criterion.
+        Split self.expression's conditions once for the rule enumerators.
+        Returns (Y, conditions, do_indices, do_vars, obs_vars) or None when
+        the expression carries no args. Eq(X, 0) observations are
+        normalized to X for graph conditioning safety.
         """
-        from probability import CausalProbability, Do
+        from probability import Do
         import sympy as sp
 
-        outs = []
-        seen = set()
-
         if not hasattr(self.expression, "args"):
-            return outs
+            return None
 
         Y = self.expression.args[0]
         conditions = list(self.expression.args[1:])
-        if not conditions:
-            return outs
 
+        do_indices = []
         do_vars = []
         obs_vars = []
-
-        for cond in conditions:
+        for i, cond in enumerate(conditions):
             if isinstance(cond, Do):
+                do_indices.append(i)
                 do_vars.append(cond.args[0])
+            elif isinstance(cond, sp.Equality):
+                obs_vars.append(cond.lhs)
             else:
-                if isinstance(cond, sp.Equality):
-                    obs_vars.append(cond.lhs)
-                else:
-                    obs_vars.append(cond)
+                obs_vars.append(cond)
+
+        return Y, conditions, do_indices, do_vars, obs_vars
+
+    def apply_all_rules(self):
+        """
+        Enumerate (rule_num, expr) for every one-step rewrite under rules
+        1-3, partitioning the conditions one time instead of once per
+        rule. This is the entry point proof search uses.
+        """
+        parts = self._partition_conditions()
+        if parts is None:
+            return []
+
+        results = []
+        for rule_num, gen in ((1, self._rule_1_candidates),
+                              (2, self._rule_2_candidates),
+                              (3, self._rule_3_candidates)):
+            try:
+                results.extend((rule_num, out) for out in gen(*parts))
+            except Exception as e:
+                logger.debug(f"Rule {rule_num} enumeration failed: {e}")
+        return results
+
+    def apply_rule_1_all(self):
+        """
+        Enumerate all one-step Rule 1 rewrites:
+
+        P(Y | do(X), Z, W) = P(Y | do(X), Z)
+        if Y ⟂ W | X, Z in G_{\bar X}
+
+        Returns a list of all distinct expressions obtainable by dropping
+        exactly one observed condition W that satisfies the criterion.
+        """
+        parts = self._partition_conditions()
+        if parts is None:
+            return []
+        return self._rule_1_candidates(*parts)
+
+    def _rule_1_candidates(self, Y, conditions, do_indices, do_vars, obs_vars):
+        from probability import CausalProbability
+        import sympy as sp
 
-        if not obs_vars:
+        outs = []
+        seen = set()
+
+        if not conditions or not obs_vars:
             return outs
 
         g_x = self._create_intervention_graph(do_vars)
 
         for W in obs_vars:
             other_obs = [v for v in obs_vars if v != W]
-            conditioning_set = do_vars + other_obs  
+            conditioning_set = do_vars + other_obs
 
             try:
-                if self._custom_d_separation(Y, W, conditioning_set, g_x):
+                if self._custom_d_separation(
+                        Y, W, conditioning_set, g_x,
+                        graph_key=("bar", frozenset(str(v) for v in do_vars))):
                     new_conditions = []
                     for c in conditions:
                         # drop the specific observed W (by object equality)
@@ -248,40 +428,27 @@ class CausalExpr:
                                 continue
                         new_conditions.append(c)
 
-                    cand = CausalProbability(Y, *new_conditions)
-                    s = str(cand)
-                    if s not in seen:
-                        seen.add(s)
-                        outs.append(cand)
+                    key = frozenset(new_conditions)
+                    if key not in seen:
+                        seen.add(key)
+                        outs.append(CausalProbability._new_presorted(Y, new_conditions))
             except Exception:
                 # keep enumerating other candidates
                 continue
 
         return outs
-    
-    def apply_rule_2_all(self):
-        from probability import CausalProbability, Do
-        import sympy as sp
-        outs = []
-        seen = set()
 
-        if not hasattr(self.expression, "args"):
-            return outs
+    def apply_rule_2_all(self):
+        parts = self._partition_conditions()
+        if parts is None:
+            return []
+        return self._rule_2_candidates(*parts)
 
-        Y = self.expression.args[0]
-        conditions = list(self.expression.args[1:])
+    def _rule_2_candidates(self, Y, conditions, do_indices, do_vars, obs_vars):
+        from probability import CausalProbability
 
-        do_indices = []
-        obs_vars = []
-        for i, cond in enumerate(conditions):
-            if isinstance(cond, Do):
-                do_indices.append(i)
-            else:
-                # normalize Eq(X,0) -> X for graph conditioning safety
-                if isinstance(cond, sp.Equality):
-                    obs_vars.append(cond.lhs)
-                else:
-                    obs_vars.append(cond)
+        outs = []
+        seen = set()
 
         if not do_indices:
             return outs
@@ -295,28 +462,28 @@ class CausalExpr:
 
             # bar other do-vars: remove incoming edges to them
             for do_var in other_do_vars:
-                incoming = [(u, v) for (u, v) in g_xz.edges() if v == str(do_var)]
-                g_xz.remove_edges_from(incoming)
+                g_xz.remove_edges_from(list(g_xz.in_edges(str(do_var))))
 
             # underline Z: remove outgoing edges from Z
-            outgoing = [(u, v) for (u, v) in g_xz.edges() if u == str(Z)]
-            g_xz.remove_edges_from(outgoing)
+            g_xz.remove_edges_from(list(g_xz.out_edges(str(Z))))
 
             try:
                 conditioning_set = other_do_vars + obs_vars
-                if self._custom_d_separation(Y, Z, conditioning_set, g_xz):
+                if self._custom_d_separation(
+                        Y, Z, conditioning_set, g_xz,
+                        graph_key=("bar", frozenset(str(v) for v in other_do_vars),
+                                   "underline", str(Z))):
                     new_conditions = conditions.copy()
                     new_conditions[idx] = Z
-                    cand = CausalProbability(Y, *new_conditions)
-                    s = str(cand)
-                    if s not in seen:
-                        seen.add(s)
-                        outs.append(cand)
+                    key = frozenset(new_conditions)
+                    if key not in seen:
+                        seen.add(key)
+                        outs.append(CausalProbability(Y, *new_conditions))
             except Exception:
                 pass
 
         return outs
-    
+
     def apply_rule_3_all(self):
         """
         Rule 3 (Action/Intervention deletion), enumerated:
@@ -328,33 +495,31 @@ class CausalExpr:
 
         We enumerate removing each do-var Z while keeping the rest.
         """
-        from probability import CausalProbability, Do
-        import sympy as sp
+        parts = self._partition_conditions()
+        if parts is None:
+            return []
+        return self._rule_3_candidates(*parts)
+
+    def _rule_3_candidates(self, Y, conditions, do_indices, do_vars, obs_vars):
+        from probability import CausalProbability
         import networkx as nx
 
         outs = []
         seen = set()
 
-        if not hasattr(self.expression, "args"):
+        if len(do_indices) == 0:
             return outs
 
-        Y = self.expression.args[0]
-        conditions = list(self.expression.args[1:])
-
-        # Identify do-vars (by index) and observed vars (variables only for d-sep)
-        do_indices = []
-        obs_vars = []
-        for i, cond in enumerate(conditions):
-            if isinstance(cond, Do):
-                do_indices.append(i)
-            else:
-                if isinstance(cond, sp.Equality):
-                    obs_vars.append(cond.lhs)
-                else:
-                    obs_vars.append(cond)
+        obs_strs = {str(v) for v in obs_vars}
 
-        if len(do_indices) == 0:
-            return outs
+        # Bar ALL do-vars once; each iteration then restores the candidate
+        # Z's incoming edges rather than re-copying and re-barring the kept
+        # vars from scratch (one copy per candidate instead of two).
+        incoming_by_v = {str(V): list(self.graph.in_edges(str(V)))
+                         for V in do_vars}
+        g_full_bar = self.graph.copy()
+        for edges in incoming_by_v.values():
+            g_full_bar.remove_edges_from(edges)
 
         # Try removing each do(Z) in turn
         for z_idx in do_indices:
@@ -362,45 +527,49 @@ class CausalExpr:
 
             # Kept interventions are all other do-vars
             kept_do_vars = [conditions[i].args[0] for i in do_indices if i != z_idx]
+            kept_key = frozenset(str(v) for v in kept_do_vars)
 
-            # Build G_{bar kept_do_vars}: remove incoming edges to ALL kept do-vars
-            g_bar = self.graph.copy()
-            for V in kept_do_vars:
-                incoming = [(u, v) for (u, v) in g_bar.edges() if v == str(V)]
-                g_bar.remove_edges_from(incoming)
-
-            # Determine whether Z is an ancestor of any observed W in this barred graph
-            is_ancestor_of_obs = False
-            for W in obs_vars:
-                try:
-                    if nx.has_path(g_bar, str(Z), str(W)):
-                        is_ancestor_of_obs = True
-                        break
-                except nx.NetworkXError:
-                    continue
-
-            # If Z is NOT an ancestor of any observed var, we may also bar Z (remove incoming edges to Z)
-            g_test = g_bar.copy()
+            # G_{bar kept_do_vars}: un-bar the candidate Z
+            g_bar = g_full_bar.copy()
+            g_bar.add_edges_from(incoming_by_v[str(Z)])
+
+            # Z is an ancestor of some observed W iff a W lies among Z's
+            # descendants in the barred graph — one cached traversal
+            # instead of one has_path query per W
+            try:
+                descs = self._descendants(g_bar, ("bar", kept_key), str(Z))
+                is_ancestor_of_obs = bool(descs & obs_strs)
+            except nx.NetworkXError:
+                is_ancestor_of_obs = False
+
+            # If Z is NOT an ancestor of any observed var, we may also bar Z
+            # (remove incoming edges to Z). g_bar is ours to mutate, so no
+            # second copy is needed.
+            g_test = g_bar
             if not is_ancestor_of_obs:
-                z_incoming = [(u, v) for (u, v) in g_test.edges() if v == str(Z)]
-                g_test.remove_edges_from(z_incoming)
+                g_test.remove_edges_from(incoming_by_v[str(Z)])
 
             # Independence test: Y ⟂ Z | kept_do_vars, obs_vars in the modified graph
             conditioning_set = kept_do_vars + obs_vars
 
+            if is_ancestor_of_obs:
+                graph_key = ("bar", kept_key)
+            else:
+                graph_key = ("bar", kept_key, "bar_z", str(Z))
+
             try:
-                if self._custom_d_separation(Y, Z, conditioning_set, g_test):
+                if self._custom_d_separation(Y, Z, conditioning_set, g_test,
+                                             graph_key=graph_key):
                     new_conditions = [c for k, c in enumerate(conditions) if k != z_idx]
-                    cand = CausalProbability(Y, *new_conditions)
-                    s = str(cand)
-                    if s not in seen:
-                        seen.add(s)
-                        outs.append(cand)
+                    key = frozenset(new_conditions)
+                    if key not in seen:
+                        seen.add(key)
+                        outs.append(CausalProbability._new_presorted(Y, new_conditions))
             except Exception:
                 pass
 
         return outs
-                    
+
     def suggest_fix(self):
         """
         Suggests symbolic fixes to the expression based on graph structure
@@ -446,10 +615,9 @@ class CausalExpr:
 
         for z in obs_vars:
             if self.graph.has_edge(z, str(Y)):
-                is_mediator = any(
-                    nx.has_path(self.graph, x, z)
-                    for x in obs_vars if x != z
-                )
+                # one ancestor traversal instead of a has_path per observed var
+                anc_of_z = nx.ancestors(self.graph, z)
+                is_mediator = any(x in anc_of_z for x in obs_vars if x != z)
                 if is_mediator:
                     suggestions.append(
                         f"{z} is a mediator between a cause and {Y}. Avoid conditioning on {z} to prevent post-treatment bias."
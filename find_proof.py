@@ -1,5 +1,8 @@
+import functools
+import itertools
 import logging
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import networkx as nx
 import sympy as sp
 
@@ -20,11 +23,35 @@ class CausalProofFinder:
       - Therefore we use apply_rule_{1,2,3}_all() and branch on all successors.
     """
 
-    def __init__(self, causal_structure=None, max_depth=10):
+    def __init__(self, causal_structure=None, max_depth=10, n_jobs=1):
         self.causal_structure = causal_structure
         self.max_depth = max_depth
+        # States within one BFS level expand independently; n_jobs > 1 (or
+        # n_jobs <= 0 for all cores) fans a level out to a process pool.
+        # The default stays serial: pool + pickling overhead only pays off
+        # once frontiers get large.
+        self.n_jobs = n_jobs
         self._validate_causal_structure()
 
+        # The causal structure is fixed for the lifetime of the finder, so
+        # build the base graph once and share intervention-graph / d-sep
+        # results across every CausalExpr created during the search.
+        self._base_graph = CausalExpr(None, self.causal_structure).graph
+        self._graph_cache = {}
+        self._dsep_cache = {}
+        self._index_cache = {}
+        self._desc_cache = {}
+        self._state_key_cache = {}
+
+        # Single reusable CausalExpr: successor expansion swaps .expression
+        # in and out instead of allocating a new wrapper per BFS state.
+        self._worker = CausalExpr(None, self.causal_structure,
+                                  graph=self._base_graph,
+                                  graph_cache=self._graph_cache,
+                                  dsep_cache=self._dsep_cache,
+                                  index_cache=self._index_cache,
+                                  desc_cache=self._desc_cache)
+
     def _validate_causal_structure(self):
         """Validate that the causal structure is acyclic (DAG). If cycles exist, try to break them."""
         if not self.causal_structure:
@@ -42,7 +69,8 @@ class CausalProofFinder:
 
         logger.warning("Causal structure contains cycles! Attempting to break cycles.")
         try:
-            cycles = list(nx.simple_cycles(G))
+            # Cap enumeration: simple_cycles is exponential in the worst case.
+            cycles = list(itertools.islice(nx.simple_cycles(G), 32))
             logger.warning(f"Cycles detected: {cycles}")
 
             G_fixed = G.copy()
@@ -99,13 +127,19 @@ class CausalProofFinder:
         If expr is of the form A - B, return (A, B).
         SymPy represents subtraction as Add(A, -B).
         """
-        expr = sp.simplify(expr)
+        # Purely structural: Add already exposes the terms, and simplify's
+        # heuristic rewrite pipeline costs milliseconds per call for
+        # nothing on inputs of the documented A - B form.
         if not isinstance(expr, sp.Add):
             return None
 
+        terms = expr.as_ordered_terms()
+        if len(terms) != 2:
+            return None
+
         pos = []
         neg = []
-        for t in expr.as_ordered_terms():
+        for t in terms:
             coeff, rest = t.as_coeff_Mul()
             if coeff == 1:
                 pos.append(rest)
@@ -119,51 +153,44 @@ class CausalProofFinder:
         return None
 
     def _state_key(self, expr):
+        """
+        Hashable canonical key for a BFS state. Structural (outcome +
+        frozensets of conditions) rather than stringified — sympy printing
+        is a full tree walk and this is called on every insertion/lookup.
+        """
         if not isinstance(expr, CausalProbability):
             return str(expr).replace(" ", "")
 
-        outcome = expr.args[0]
-
-        do_vars = []
-        obs_vars = []
+        cached = self._state_key_cache.get(expr)
+        if cached is not None:
+            return cached
 
+        do_ops = []
+        obs = []
         for cond in expr.args[1:]:
             if isinstance(cond, Do):
-                do_vars.append(str(cond))
+                do_ops.append(cond)
             else:
-                obs_vars.append(str(cond))  # keep Eq(Z,0) distinct
-
-        do_vars.sort()
-        obs_vars.sort()
+                obs.append(cond)  # keep Eq(Z,0) distinct
 
-        return f"Y={outcome}|DO={','.join(do_vars)}|OBS={','.join(obs_vars)}"
+        key = (expr.args[0], frozenset(do_ops), frozenset(obs))
+        self._state_key_cache[expr] = key
+        return key
 
     def _do_calculus_successors(self, expr):
         """
         Return list of (rule_label, next_expr) for ALL one-step do-calculus rewrites.
         """
-        ce = CausalExpr(expr, self.causal_structure)
+        ce = self._worker
+        ce.expression = expr
 
         successors = []
 
         # Rule ordering only affects search order, NOT completeness
-        rule_gens = [
-            (1, ce.apply_rule_1_all),
-            (2, ce.apply_rule_2_all),
-            (3, ce.apply_rule_3_all),
-        ]
-
-        for rule_num, gen in rule_gens:
-            try:
-                outs = gen()  # list of expressions
-            except Exception as e:
-                logger.debug(f"Rule {rule_num} enumeration failed on {expr}: {e}")
+        for rule_num, out in ce.apply_all_rules():
+            if self._are_expressions_equivalent(out, expr):
                 continue
-
-            for out in outs:
-                if self._are_expressions_equivalent(out, expr):
-                    continue
-                successors.append((f"Do-calculus Rule {rule_num}", out))
+            successors.append((f"Do-calculus Rule {rule_num}", out))
 
         uniq = []
         seen = set()
@@ -211,41 +238,151 @@ class CausalProofFinder:
             return [("ATE-left", p_left), ("ATE-right", p_right)]
         raise TypeError("Unsupported expression type: expected CausalProbability or A-B of CausalProbability")
 
-    def _find_proof_single(self, start_expr, target_expr):
-        if self._are_expressions_equivalent(start_expr, target_expr):
-            logger.info("Expressions are already equivalent")
+    def _do_calculus_predecessors(self, expr, start_expr):
+        """
+        Enumerate (rule_label, prev) pairs such that expr is a one-step
+        do-calculus successor of prev — the reverse moves used by the
+        backward half of the bidirectional search.
+
+        Forward rules only ever drop or convert conditions, so every
+        condition addable in reverse must come from start_expr. Each
+        candidate is verified against the forward enumerators, making the
+        reverse expansion sound by construction.
+        """
+        if not isinstance(expr, CausalProbability):
             return []
 
-        start_key = self._state_key(start_expr)
-        target_key = self._state_key(target_expr)
+        outcome = expr.args[0]
+        conditions = list(expr.args[1:])
+        cond_set = expr._condition_set
 
-        queue = deque([(start_expr, [])])
-        visited = {start_key}
+        start_do = [c for c in start_expr.args[1:] if isinstance(c, Do)]
+        start_obs = [c for c in start_expr.args[1:] if not isinstance(c, Do)]
 
-        while queue:
-            cur, path = queue.popleft()
+        candidates = []
 
-            if len(path) >= self.max_depth:
-                continue
+        # reverse Rule 1: re-add an observed condition the forward search
+        # could have dropped (an original observation, or the observed form
+        # of an originally intervened variable)
+        for c in start_obs + [d.args[0] for d in start_do]:
+            if c not in cond_set:
+                candidates.append(CausalProbability(outcome, *conditions, c))
 
-            # Goal check (structural, then fallback to key)
-            if self._are_expressions_equivalent(cur, target_expr) or self._state_key(cur) == target_key:
-                logger.info(f"Found proof with {len(path)} steps")
-                return path
+        # reverse Rule 2: an observed symbol that started as do(...) may be
+        # switched back to the intervention
+        for i, c in enumerate(conditions):
+            if isinstance(c, Do):
+                continue
+            for d in start_do:
+                if d.args[0] == c and d not in cond_set:
+                    new_conditions = conditions.copy()
+                    new_conditions[i] = d
+                    candidates.append(CausalProbability(outcome, *new_conditions))
+
+        # reverse Rule 3: re-add a deleted intervention
+        for d in start_do:
+            if d not in cond_set:
+                candidates.append(CausalProbability(outcome, *conditions, d))
+
+        expr_key = self._state_key(expr)
+        preds = []
+        seen = set()
+        for cand in candidates:
+            k = self._state_key(cand)
+            if k in seen:
+                continue
+            seen.add(k)
+            for rule_label, nxt in self._do_calculus_successors(cand):
+                if self._state_key(nxt) == expr_key:
+                    preds.append((rule_label, cand))
+                    break
+        return preds
 
-            for rule_label, nxt in self._do_calculus_successors(cur):
-                k = self._state_key(nxt)
-                if k in visited:
-                    continue
-                visited.add(k)
+    def _expand_level(self, exprs, worker_fn):
+        """
+        Map worker_fn over one BFS level. Deduplication against the
+        visited sets happens single-threaded in the caller, so with
+        n_jobs != 1 the per-state expansions fan out to worker processes;
+        the default is a plain loop.
+        """
+        if self.n_jobs != 1 and len(exprs) > 1:
+            max_workers = self.n_jobs if self.n_jobs > 0 else None
+            with ProcessPoolExecutor(max_workers=max_workers) as ex:
+                return list(ex.map(worker_fn, exprs))
+        return [worker_fn(e) for e in exprs]
 
-                new_path = path + [(rule_label, nxt)]
+    def _find_proof_single(self, start_expr, target_expr):
+        """
+        Bidirectional BFS: expand one-step rewrites from the start and
+        verified reverse rewrites from the target, meeting in the middle.
+        Cuts the explored space from O(b^d) to O(b^(d/2)) per side.
+        """
+        if self._are_expressions_equivalent(start_expr, target_expr):
+            logger.info("Expressions are already equivalent")
+            return []
 
-                if self._are_expressions_equivalent(nxt, target_expr) or k == target_key:
-                    logger.info(f"Found proof with {len(new_path)} steps")
-                    return new_path
+        start_key = self._state_key(start_expr)
+        target_key = self._state_key(target_expr)
+        if start_key == target_key:
+            logger.info("Expressions are already equivalent")
+            return []
 
-                queue.append((nxt, new_path))
+        # Both maps go state_key -> (expr, partial proof). Forward paths
+        # end at the keyed state; backward suffixes run from the keyed
+        # state to the target, both stored in forward order.
+        seen_s = {start_key: (start_expr, [])}
+        seen_t = {target_key: (target_expr, [])}
+        front_s = dict(seen_s)
+        front_t = dict(seen_t)
+        depth_s = depth_t = 0
+
+        while front_s and front_t and depth_s + depth_t < self.max_depth:
+            # expand the smaller frontier one full level
+            if len(front_s) <= len(front_t):
+                entries = list(front_s.values())
+                succ_lists = self._expand_level(
+                    [e for e, _ in entries], self._do_calculus_successors)
+
+                new_front = {}
+                for (expr, path), succs in zip(entries, succ_lists):
+                    for rule_label, nxt in succs:
+                        k = self._state_key(nxt)
+                        if k in seen_s:
+                            continue
+                        entry = (nxt, path + [(rule_label, nxt)])
+                        seen_s[k] = entry
+                        new_front[k] = entry
+                front_s = new_front
+                depth_s += 1
+            else:
+                entries = list(front_t.values())
+                pred_lists = self._expand_level(
+                    [e for e, _ in entries],
+                    functools.partial(self._do_calculus_predecessors,
+                                      start_expr=start_expr))
+
+                new_front = {}
+                for (expr, suffix), preds in zip(entries, pred_lists):
+                    for rule_label, prev in preds:
+                        k = self._state_key(prev)
+                        if k in seen_t:
+                            continue
+                        entry = (prev, [(rule_label, expr)] + suffix)
+                        seen_t[k] = entry
+                        new_front[k] = entry
+                front_t = new_front
+                depth_t += 1
+
+            meet = seen_s.keys() & seen_t.keys()
+            if meet:
+                best = None
+                for k in meet:
+                    _, path = seen_s[k]
+                    _, suffix = seen_t[k]
+                    if best is None or len(path) + len(suffix) < len(best):
+                        best = path + suffix
+                logger.info(f"Found proof with {len(best)} steps")
+                return best
 
         logger.info(f"No proof found within {self.max_depth} steps")
         return None
@@ -253,7 +390,8 @@ class CausalProofFinder:
     def explore_all_equivalent_expressions(self, start_expr, max_depth=None):
         """
         Explore all expressions reachable by do-calculus (rules 1/2/3) within max_depth.
-        Returns dict: key_str -> (expr_obj, last_rule_label)
+        Returns dict: _state_key tuple (outcome, frozenset(do), frozenset(obs))
+        -> (expr_obj, last_rule_label)
         """
         if max_depth is None:
             max_depth = self.max_depth
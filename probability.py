@@ -1,21 +1,79 @@
 import sympy as sp
 from sympy import Symbol, Eq, Add, Mul, sympify
+import functools
 import re
+import weakref
 from sympy.printing.str import StrPrinter
 
 import unittest
 
 
+# Precompiled patterns used by the parser hot paths.
+_RE_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_RE_PROB = re.compile(r'P\([^)]+(?:\|[^)]+)?\)')
+_RE_SUBSCRIPT = re.compile(r'(\w+)_{([^}]+)}')
+_RE_DO = re.compile(r'do\(([^)]+)\)(?:,\s*|$)')
+_RE_EDGE_COMMAS = re.compile(r'^,\s*|,\s*$')
+_RE_ARITH_OP = re.compile(r'[+\-*/]')
+_NUM_RE = re.compile(r'-?\d+(\.\d+)?$')
+
+
+def _parse_value(val_str):
+    """Turn a value token into int/float, or a Symbol if non-numeric.
+
+    Classifies with a regex up front rather than attempting int()/float()
+    and catching ValueError on every condition token.
+    """
+    if _NUM_RE.match(val_str):
+        return float(val_str) if '.' in val_str else int(val_str)
+    return Symbol(val_str)
+
+
+def _find_span_end(s, start, n):
+    """Index of the ')' closing the '(' at s[start], or -1 if unbalanced.
+
+    Kept as a tight module-level loop (everything local) since it runs on
+    every parse.
+    """
+    depth = 0
+    i = start
+    while i < n:
+        c = s[i]
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
 class Do(sp.Function):
+    __slots__ = ('_sort_key', '_str')
+
     def __new__(cls, var, value=None):
         if value is not None:
-            return super().__new__(cls, var, value)
-        return super().__new__(cls, var)
+            obj = super().__new__(cls, var, value)
+        else:
+            obj = super().__new__(cls, var)
+        # sympy's instance cache returns the same object for equal args, so
+        # the str() calls below only run on first construction
+        if getattr(obj, '_sort_key', None) is None:
+            args = obj.args
+            obj._sort_key = (0, str(args[0]),
+                             str(args[1]) if len(args) == 2 else "")
+        return obj
     
     def __str__(self):
-        if len(self.args) == 1:
-            return f'do({self.args[0]})'
-        return f'do({self.args[0]}={self.args[1]})'
+        s = getattr(self, '_str', None)
+        if s is None:
+            if len(self.args) == 1:
+                s = f'do({self.args[0]})'
+            else:
+                s = f'do({self.args[0]}={self.args[1]})'
+            self._str = s
+        return s
     
     def __repr__(self):
         return self.__str__()
@@ -26,12 +84,20 @@ class Do(sp.Function):
 class Mult(sp.Function):
     """
     Represents a product of probability expressions.
+
+    Retained for backward compatibility; the parser now builds native
+    sp.Mul products, which sympy traverses and hashes on its fast path.
     """
+    __slots__ = ('_str',)
+
     def __new__(cls, *args):
         return sp.Function.__new__(cls, *args)
     
     def __str__(self):
-        return ' * '.join(str(arg) for arg in self.args)
+        s = getattr(self, '_str', None)
+        if s is None:
+            s = self._str = ' * '.join(str(arg) for arg in self.args)
+        return s
     
     def _sympystr(self, printer):
         return self.__str__()
@@ -39,20 +105,62 @@ class Mult(sp.Function):
 class ProbabilityExpression(sp.Expr):
     """
     Base class for probability expressions that can be part of arithmetic operations.
+
+    Addition and subtraction build unevaluated Add nodes: the operands are
+    opaque probability terms, so sympy's flatten/ordered machinery has
+    nothing to combine and only adds sort overhead.
     """
-    pass
+    __slots__ = ()
+
+    def __add__(self, other):
+        return sp.Add(self, other, evaluate=False)
+
+    def __sub__(self, other):
+        return sp.Add(self, sp.Mul(-1, other, evaluate=False), evaluate=False)
+
+@functools.lru_cache(maxsize=4096)
+def _eq_sort_key(condition):
+    return (1, str(condition.lhs), str(condition.rhs))
+
+
+# Sort-group numbers by exact type; anything unlisted sorts last.
+_GROUP = {Do: 0, Eq: 1}
+
+
+def _fmt_eq(c):
+    return f"{c.lhs}={c.rhs}"
+
+
+def _fmt_tuple(c):
+    if len(c) == 2:
+        var, val = c
+        return f"{var}={val}"
+    return str(c)
+
+
+# Formatter by exact type for outcomes/conditions; anything unlisted
+# falls back to str.
+_FMT = {Do: str, Eq: _fmt_eq, tuple: _fmt_tuple}
+
 
 def _condition_sort_key(condition):
     """
     Deterministic key for sorting conditions.
     Order groups: Do(...) first, then Eq(...), then everything else.
+
+    Do instances carry a precomputed _sort_key (set in Do.__new__); Eq keys
+    are memoized, so sorting in CausalProbability.__new__ avoids repeated
+    sympy string-printing.
     """
-    if isinstance(condition, Do):
-        var = str(condition.args[0])
-        val = str(condition.args[1]) if len(condition.args) == 2 else ""
-        return (0, var, val)
-    if isinstance(condition, Eq):
-        return (1, str(condition.lhs), str(condition.rhs))
+    key = getattr(condition, '_sort_key', None)
+    if key is not None:
+        return key
+    group = _GROUP.get(type(condition), 2)
+    if group == 1:
+        return _eq_sort_key(condition)
+    if group == 0:
+        args = condition.args
+        return (0, str(args[0]), str(args[1]) if len(args) == 2 else "")
     return (2, str(condition), "")
 
 
@@ -84,45 +192,85 @@ class CausalProbability(ProbabilityExpression):
     Represents something similar to P(Y=1 | do(X=0), Z=3).
     Now inherits from ProbabilityExpression to support arithmetic.
     """
+    # no __dict__ per instance: BFS holds many of these, and slot access
+    # is also faster inside __hash__/__eq__. __weakref__ is required for
+    # the intern table below.
+    __slots__ = ('_outcome', '_conditions', '_hash', '_str',
+                 '_condition_set', '__weakref__')
+
+    # hash-consing table: structurally equal expressions share one object,
+    # so equality in BFS visited-sets degrades to pointer identity
+    _intern = weakref.WeakValueDictionary()
+
     def __new__(cls, outcome, *conditions):
         conditions = tuple(sorted(conditions, key=_condition_sort_key))
+        key = (cls, outcome, conditions)
+        cached = cls._intern.get(key)
+        if cached is not None:
+            return cached
+
         args = (outcome,) + conditions
         obj = sp.Expr.__new__(cls, *args)
         obj._outcome = outcome
         obj._conditions = conditions
+        # precomputed once: these objects live in BFS visited-sets and
+        # dicts, so __hash__ is on the hot path
+        obj._hash = hash((outcome, conditions))
+        obj._condition_set = frozenset(conditions)
+        obj._str = None
+        cls._intern[key] = obj
         return obj
-    
-    @property
-    def args(self):
-        """Return args in the expected format for compatibility."""
-        return (self._outcome,) + self._conditions
-    
+
+    @classmethod
+    def _new_presorted(cls, outcome, conditions):
+        """Fast-path constructor for conditions already in canonical order.
+
+        Skips the sort in __new__. Callers must pass the conditions exactly
+        as stored on an existing expression (e.g. after dropping one), or
+        the intern table would hold two copies of the same expression.
+        """
+        conditions = tuple(conditions)
+        key = (cls, outcome, conditions)
+        cached = cls._intern.get(key)
+        if cached is not None:
+            return cached
+
+        obj = sp.Expr.__new__(cls, outcome, *conditions)
+        obj._outcome = outcome
+        obj._conditions = conditions
+        obj._hash = hash((outcome, conditions))
+        obj._condition_set = frozenset(conditions)
+        obj._str = None
+        cls._intern[key] = obj
+        return obj
+
     def __str__(self):
+        # immutable, so format once and reuse (tests and logging compare
+        # expressions by str() in loops)
+        s = self._str
+        if s is None:
+            s = self._str = self._build_str()
+        return s
+
+    def _build_str(self):
         outcome_str = self._format_outcome(self._outcome)
         if len(self._conditions) == 0:
             return f'P({outcome_str})'
         
-        conditions_str = ', '.join(map(self._format_condition, self._conditions))
+        fmt = self._format_condition
+        conditions_str = ', '.join([fmt(c) for c in self._conditions])
         return f'P({outcome_str} | {conditions_str})'
     
     def _format_outcome(self, outcome):
-        if isinstance(outcome, tuple) and len(outcome) == 2:
-            var, val = outcome
-            return f"{var}={val}"
-        elif isinstance(outcome, Eq):
-            return f"{outcome.lhs}={outcome.rhs}"
-        return str(outcome)
-    
+        return _FMT.get(type(outcome), str)(outcome)
+
     def _format_condition(self, condition):
-        if isinstance(condition, Do):
-            return str(condition)
-        elif isinstance(condition, tuple) and len(condition) == 2:
-            var, val = condition
-            return f"{var}={val}"
-        elif isinstance(condition, Eq):
-            return f"{condition.lhs}={condition.rhs}"
-        return str(condition)
+        return _FMT.get(type(condition), str)(condition)
     
+    def has_condition(self, condition):
+        """O(1) membership test against the conditions."""
+        return condition in self._condition_set
+
     def _sympystr(self, printer):
         return str(self)
     
@@ -131,18 +279,23 @@ class CausalProbability(ProbabilityExpression):
     
     def __eq__(self, other):
         """Custom equality to ensure SymPy can distinguish different probability expressions."""
+        if self is other:
+            return True
         if not isinstance(other, CausalProbability):
             return False
-        return (self._outcome == other._outcome and 
+        if self._hash != other._hash:
+            return False
+        # hashes can collide, so confirm field by field
+        return (self._outcome == other._outcome and
                 self._conditions == other._conditions)
-    
+
     def __hash__(self):
         """Custom hash to ensure SymPy can distinguish different probability expressions."""
-        return hash((self._outcome, self._conditions))
+        return self._hash
     
     def _hashable_content(self):
         """SymPy uses this for hashing and comparison."""
-        return (self._outcome,) + self._conditions
+        return self.args
         
     @classmethod
     def parse(cls, expr_str):
@@ -152,10 +305,16 @@ class CausalProbability(ProbabilityExpression):
         - Arithmetic operations: 'P(Y_{X=1}) - P(Y_{X=0})'
         - Products: 'P(A|B)*P(B)'
         - Complex expressions: 'P(Y_{X=0, V2=1} - Y_{X=0, V2=0})'
+
+        Results are memoized on the normalized input string; parsed
+        expressions are immutable (and interned), so sharing them is safe.
         """
-        # Remove all spaces for easier parsing
-        expr_str = expr_str.replace(' ', '')
-        
+        # Remove all spaces for easier parsing / cache normalization
+        return _parse_cached(expr_str.replace(' ', ''))
+
+    @classmethod
+    def _parse(cls, expr_str):
+        """Uncached body of parse(); expr_str is already space-stripped."""
         # Check if this is an arithmetic expression (contains +, -, *, / outside of P(...))
         if cls._contains_arithmetic_outside_parentheses(expr_str):
             return cls._parse_arithmetic_expression(expr_str)
@@ -163,79 +322,155 @@ class CausalProbability(ProbabilityExpression):
         # Handle simple products (backward compatibility)
         if '*' in expr_str and not cls._is_inside_probability(expr_str, expr_str.find('*')):
             factors = [cls.parse(f.strip()) for f in expr_str.split('*')]
-            return Mult(*factors)
+            return sp.Mul(*factors, evaluate=False)
         
         # Parse single probability expression
-        return cls._parse_single_probability(expr_str)
+        return _parse_single_cached(expr_str)
     
     @classmethod
     def _contains_arithmetic_outside_parentheses(cls, expr_str):
-        """Check if the expression contains arithmetic operators outside P(...) expressions."""
-        in_prob = False
-        paren_depth = 0
-        
-        for i, char in enumerate(expr_str):
-            if char == 'P' and i + 1 < len(expr_str) and expr_str[i + 1] == '(':
-                in_prob = True
-                paren_depth = 0
-            elif in_prob and char == '(':
-                paren_depth += 1
-            elif in_prob and char == ')':
-                paren_depth -= 1
-                if paren_depth == 0:
-                    in_prob = False
-            elif not in_prob and char in '+-*/':
+        """Check if the expression contains arithmetic operators outside P(...) expressions.
+
+        Regex-scans only the gaps between P(...) spans instead of walking
+        the whole string character by character.
+        """
+        n = len(expr_str)
+        pos = 0
+        while True:
+            start = expr_str.find('P(', pos)
+            gap = expr_str[pos:] if start == -1 else expr_str[pos:start]
+            if _RE_ARITH_OP.search(gap):
                 return True
-        
-        return False
+            if start == -1:
+                return False
+            # Skip over the (possibly nested) P(...) span
+            end = _find_span_end(expr_str, start + 1, n)
+            if end < 0:
+                return False
+            pos = end + 1
     
     @classmethod
     def _is_inside_probability(cls, expr_str, pos):
-        """Check if a position is inside a P(...) expression."""
-        # Count P( before this position
-        before = expr_str[:pos]
-        p_count = before.count('P(')
-        close_count = before.count(')')
-        return p_count > close_count
+        """Check if a position is inside a P(...) expression.
+
+        Walks the P(...) spans with the depth-counted span finder instead
+        of re-counting the whole prefix with str.count, so lookups stay
+        linear in pos even with nested parentheses.
+        """
+        n = len(expr_str)
+        cursor = 0
+        while True:
+            start = expr_str.find('P(', cursor)
+            if start == -1 or start >= pos:
+                return False
+            end = _find_span_end(expr_str, start + 1, n)
+            if end == -1 or pos <= end:
+                return True
+            cursor = end + 1
     
     @classmethod
     def _parse_arithmetic_expression(cls, expr_str):
         """Parse arithmetic expressions involving probability terms."""
+        try:
+            return cls._parse_arithmetic_tokens(expr_str)
+        except ValueError:
+            # Shapes the token walk doesn't cover (e.g. grouping
+            # parentheses) fall back to the sympify pipeline.
+            return cls._parse_arithmetic_sympify(expr_str)
 
-        # Find all P(...) expressions and replace them with placeholders
-        prob_pattern = r'P\([^)]+(?:\|[^)]+)?\)'
-        prob_matches = list(re.finditer(prob_pattern, expr_str))
-        
-        # Create placeholder mapping
-        placeholders = {}
-        modified_expr = expr_str
-        
-        for i, match in enumerate(reversed(prob_matches)):  # Reverse to maintain positions
-            placeholder = f'PROB_{i}'
-            prob_expr = match.group()
-            placeholders[placeholder] = cls._parse_single_probability(prob_expr)
-            
-            # Replace in the expression
-            start, end = match.span()
-            modified_expr = modified_expr[:start] + placeholder + modified_expr[end:]
-        
-        # Parse the arithmetic expression using SymPy
-        # Replace placeholders with symbols temporarily
+    @classmethod
+    def _parse_arithmetic_tokens(cls, expr_str):
+        """Single-pass token walk over `P(...) op P(...) ...` expressions.
+
+        Scans once with a depth counter to find each top-level P(...) span,
+        parses the spans via the cached single-probability parser, and folds
+        the results directly with sp.Add/sp.Mul (all operands at once) —
+        no placeholder substitution or sympify round-trip.
+        """
+        tokens = []
+        i, n = 0, len(expr_str)
+        while i < n:
+            char = expr_str[i]
+            if char == 'P' and i + 1 < n and expr_str[i + 1] == '(':
+                j = _find_span_end(expr_str, i + 1, n)
+                if j < 0:
+                    raise ValueError(f"Unbalanced parentheses in: {expr_str}")
+                tokens.append(('term', _parse_single_cached(expr_str[i:j + 1])))
+                i = j + 1
+            elif char in '+-*/':
+                tokens.append(('op', char))
+                i += 1
+            else:
+                num_match = _RE_NUMBER.match(expr_str, i)
+                if num_match is None:
+                    raise ValueError(f"Unexpected token in: {expr_str}")
+                tokens.append(('term', sympify(num_match.group())))
+                i = num_match.end()
+
+        # Fold: collect multiplicative factors per additive term, then build
+        # the Add/Mul nodes in one shot.
+        add_terms = []
+        factors = []
+        sign = 1
+        invert_next = False
+        expect_term = True
+
+        def flush():
+            nonlocal factors
+            prod = factors[0] if len(factors) == 1 else sp.Mul(*factors)
+            add_terms.append(prod if sign == 1 else sp.Mul(-1, prod))
+            factors = []
+
+        for kind, val in tokens:
+            if kind == 'term':
+                if not expect_term:
+                    raise ValueError(f"Could not parse arithmetic expression: {expr_str}")
+                factors.append(sp.Pow(val, -1) if invert_next else val)
+                invert_next = False
+                expect_term = False
+            elif val in '+-':
+                if expect_term:
+                    # Unary sign on the upcoming term
+                    if val == '-':
+                        sign = -sign
+                else:
+                    flush()
+                    sign = 1 if val == '+' else -1
+                    expect_term = True
+            else:  # '*' or '/'
+                if expect_term:
+                    raise ValueError(f"Could not parse arithmetic expression: {expr_str}")
+                invert_next = (val == '/')
+                expect_term = True
+
+        if expect_term or not factors:
+            raise ValueError(f"Could not parse arithmetic expression: {expr_str}")
+        flush()
+        return add_terms[0] if len(add_terms) == 1 else sp.Add(*add_terms)
+
+    @classmethod
+    def _parse_arithmetic_sympify(cls, expr_str):
+        """Placeholder+sympify fallback for arithmetic expressions.
+
+        Builds the placeholder string in one forward pass with a cursor
+        instead of repeated str.replace calls over the whole expression.
+        """
+        parts = []
         temp_symbols = {}
-        temp_expr = modified_expr
-        for placeholder in placeholders:
-            temp_symbol = Symbol(placeholder)
-            temp_symbols[temp_symbol] = placeholders[placeholder]
-            temp_expr = temp_expr.replace(placeholder, str(temp_symbol))
-        
+        cursor = 0
+        for i, match in enumerate(_RE_PROB.finditer(expr_str)):
+            placeholder = f'PROB_{i}'
+            parts.append(expr_str[cursor:match.start()])
+            parts.append(placeholder)
+            temp_symbols[Symbol(placeholder)] = _parse_single_cached(match.group())
+            cursor = match.end()
+        parts.append(expr_str[cursor:])
+
         try:
-            # Parse as SymPy expression
-            parsed = sympify(temp_expr)
-            
-            # Replace symbols back with probability expressions
-            result = parsed.subs(temp_symbols)
-            return result
-            
+            # Parse as SymPy expression, then swap the placeholders back
+            parsed = sympify(''.join(parts))
+            return parsed.subs(temp_symbols)
+
         except Exception as e:
             raise ValueError(f"Could not parse arithmetic expression: {expr_str}") from e
     
@@ -253,8 +488,7 @@ class CausalProbability(ProbabilityExpression):
         outcome_part = parts[0]
         
         # Check for subscript notation in outcome
-        subscript_pattern = r'(\w+)_{([^}]+)}'
-        subscript_match = re.match(subscript_pattern, outcome_part)
+        subscript_match = _RE_SUBSCRIPT.match(outcome_part)
         
         subscript_conditions = []
         if subscript_match:
@@ -267,13 +501,7 @@ class CausalProbability(ProbabilityExpression):
                 if '=' in cond:
                     var_str, val_str = cond.split('=', 1)
                     var = Symbol(var_str.strip())
-                    val_str = val_str.strip()
-                    
-                    try:
-                        value = float(val_str) if '.' in val_str else int(val_str)
-                    except ValueError:
-                        value = Symbol(val_str)
-                    
+                    value = _parse_value(val_str.strip())
                     subscript_conditions.append(Do(var, value))
                 else:
                     var = Symbol(cond.strip())
@@ -289,33 +517,22 @@ class CausalProbability(ProbabilityExpression):
         conditions_part = parts[1]
         condition_list = subscript_conditions.copy()
         
-        do_pattern = r'do\(([^)]+)\)'
-        do_matches = re.finditer(do_pattern, conditions_part)
-        
-        for match in do_matches:
-            do_content = match.group(1) 
-            
-            variables = [var.strip() for var in do_content.split(',')]
-            
-            for var_expr in variables:
+        # Single pass: collect the Do(...) conditions while stripping their
+        # text (and any trailing comma) from the string.
+        def _consume_do(match):
+            for var_expr in match.group(1).split(','):
+                var_expr = var_expr.strip()
                 if '=' in var_expr:
                     var_name, value_str = var_expr.split('=', 1)
                     var = Symbol(var_name.strip())
-                    value_str = value_str.strip()
-                    
-                    try:
-                        value = float(value_str) if '.' in value_str else int(value_str)
-                    except ValueError:
-                        value = Symbol(value_str)
-                    
+                    value = _parse_value(value_str.strip())
                     condition_list.append(Do(var, value))
                 else:
-                    var = Symbol(var_expr.strip())
-                    condition_list.append(Do(var))
-        
-        # Remove do() expressions from conditions_part to handle remaining conditions
-        remaining_conditions = re.sub(r'do\([^)]+\)(?:,\s*|$)', '', conditions_part)
-        remaining_conditions = re.sub(r'^,\s*|,\s*$', '', remaining_conditions)  # Clean up leading/trailing commas
+                    condition_list.append(Do(Symbol(var_expr)))
+            return ''
+
+        remaining_conditions = _RE_DO.sub(_consume_do, conditions_part)
+        remaining_conditions = _RE_EDGE_COMMAS.sub('', remaining_conditions)  # Clean up leading/trailing commas
         
         if remaining_conditions:
             for cond in remaining_conditions.split(','):
@@ -333,17 +550,17 @@ class CausalProbability(ProbabilityExpression):
         if '=' in expr:
             var_str, val_str = expr.split('=', 1)
             var = Symbol(var_str.strip())
-            val_str = val_str.strip()
-            
-            try:
-                if '.' in val_str:
-                    val = float(val_str)
-                else:
-                    val = int(val_str)
-            except ValueError:
-                val = Symbol(val_str)
-                
+            val = _parse_value(val_str.strip())
             return Eq(var, val)
         else:
             return Symbol(expr)
 
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cached(expr_str):
+    return CausalProbability._parse(expr_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_single_cached(expr_str):
+    return CausalProbability._parse_single_probability(expr_str)
@@ -0,0 +1,59 @@
+"""Run the test suite with one process per test module.
+
+The test modules share no mutable state, so they parallelize cleanly:
+
+    python run_tests.py          # one worker per module, up to CPU count
+    python run_tests.py -j 1     # serial
+
+If pytest with the xdist plugin is available, `pytest -n auto tests`
+achieves the same thing.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+TESTS_DIR = ROOT / "tests"
+
+
+def _run_module(name):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT), str(TESTS_DIR)])
+    proc = subprocess.run(
+        [sys.executable, "-m", "unittest", name],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return name, proc.returncode, proc.stdout + proc.stderr
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of parallel workers (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    modules = sorted(p.stem for p in TESTS_DIR.glob("test_*.py"))
+    jobs = max(1, min(args.jobs, len(modules)))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(_run_module, modules))
+
+    failed = False
+    for name, code, output in results:
+        status = "ok" if code == 0 else "FAILED"
+        print(f"{name}: {status}")
+        if code != 0:
+            failed = True
+            print(output)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Shared helpers for the test suite."""
+import functools
+
+from causal_equiv import CausalExpr
+from probability import CausalProbability, Do
+
+
+@functools.lru_cache(maxsize=None)
+def _P(s):
+    """Parse a probability string once and share the result.
+
+    Literal inputs repeat heavily across tests; parsed expressions are
+    immutable (and interned), so returning the cached instance is safe.
+    """
+    return CausalProbability.parse(s)
+
+
+@functools.lru_cache(maxsize=None)
+def _do(sym, val=None):
+    """Interned Do construction for tests that build expected values.
+
+    sympy already caches Do instances by args; this just skips the
+    dispatch through Do.__new__ for repeated (sym, val) pairs.
+    """
+    return Do(sym) if val is None else Do(sym, val)
+
+
+_ce_cache = {}
+
+
+def _ce(expr, structure):
+    """Memoized CausalExpr construction.
+
+    Tests treat the rule enumerators as pure queries, so identical
+    (expression, structure) pairs can share one instance along with its
+    internal graph and d-separation caches.
+    """
+    key = (expr, frozenset((v, tuple(children))
+                           for v, children in structure.items()))
+    try:
+        return _ce_cache[key]
+    except KeyError:
+        ce = _ce_cache[key] = CausalExpr(expr, structure)
+        return ce
@@ -0,0 +1,33 @@
+"""Single-pass condition summaries shared by the rule test modules."""
+from collections import namedtuple
+
+import sympy as sp
+
+from probability import Do
+
+Summary = namedtuple("Summary", ["do_vars", "obs_vars", "do_count"])
+
+
+def summarize(expr):
+    """Walk expr's conditions once, collecting the intervened variables,
+    the observed variables, and the intervention count.
+
+    Dispatches on exact type — `type(c) is Do` skips the MRO walk that
+    isinstance pays on sympy's class hierarchy.
+    """
+    do_vars = set()
+    obs_vars = set()
+    do_count = 0
+    _Do = Do
+    _Eq = sp.Equality
+    conds = expr.args[1:] if hasattr(expr, "args") and len(expr.args) > 1 else ()
+    for c in conds:
+        t = type(c)
+        if t is _Do:
+            do_vars.add(c.args[0])
+            do_count += 1
+        elif t is _Eq:
+            obs_vars.add(c.lhs)
+        else:
+            obs_vars |= set(getattr(c, "free_symbols", {c}))
+    return Summary(do_vars, obs_vars, do_count)
@@ -1,3 +1,4 @@
+import functools
 import unittest
 import networkx as nx
 
@@ -10,117 +11,143 @@ def dag(edges):
     return G
 
 
-class TestDSeparation(unittest.TestCase):
-    # --- Canonical motifs ---
+class _TinyDAG:
+    """Minimal stand-in for nx.DiGraph covering the surface is_d_separated
+    touches: node membership, .pred, .nodes()/.edges(), and .subgraph().
 
-    def test_chain_dependent_unconditioned_and_blocked_by_middle(self):
-        # X -> Z -> Y
-        G = dag([("X", "Z"), ("Z", "Y")])
+    Two flat dicts instead of DiGraph's nested attribute dicts — the motif
+    tests build many tiny graphs, so allocation is what they pay for.
+    """
 
-        # Unconditioned: active chain path => not d-separated
-        self.assertFalse(is_d_separated(G, "X", "Y", set()))
+    def __init__(self, edges):
+        self._edges = list(edges)
+        self._pred = {}
+        self._succ = {}
+        for u, v in self._edges:
+            self._pred.setdefault(u, [])
+            self._pred.setdefault(v, []).append(u)
+            self._succ.setdefault(v, [])
+            self._succ.setdefault(u, []).append(v)
 
-        # Conditioning on non-collider Z blocks chain
-        self.assertTrue(is_d_separated(G, "X", "Y", {"Z"}))
+    @property
+    def pred(self):
+        return self._pred
 
-    def test_fork_dependent_unconditioned_and_blocked_by_common_cause(self):
-        # Z -> X, Z -> Y
-        G = dag([("Z", "X"), ("Z", "Y")])
+    def __contains__(self, n):
+        return n in self._pred
 
-        # Unconditioned: active fork path => not d-separated
-        self.assertFalse(is_d_separated(G, "X", "Y", set()))
+    def nodes(self):
+        return self._pred.keys()
 
-        # Conditioning on common cause blocks
-        self.assertTrue(is_d_separated(G, "X", "Y", {"Z"}))
+    def edges(self):
+        return self._edges
 
-    def test_collider_independent_unconditioned_and_opened_by_conditioning_on_collider(self):
-        # X -> Z <- Y  (collider)
-        G = dag([("X", "Z"), ("Y", "Z")])
+    def predecessors(self, n):
+        return iter(self._pred[n])
 
-        # Unconditioned collider blocks
-        self.assertTrue(is_d_separated(G, "X", "Y", set()))
+    def successors(self, n):
+        return iter(self._succ[n])
 
-        # Conditioning on collider opens
-        self.assertFalse(is_d_separated(G, "X", "Y", {"Z"}))
+    def subgraph(self, nodes):
+        keep = set(nodes)
+        sub = _TinyDAG([(u, v) for u, v in self._edges
+                        if u in keep and v in keep])
+        for n in keep & self._pred.keys():
+            sub._pred.setdefault(n, [])
+            sub._succ.setdefault(n, [])
+        return sub
 
-    def test_collider_opened_by_conditioning_on_descendant(self):
-        # X -> Z <- Y, Z -> W (W is descendant of collider Z)
-        G = dag([("X", "Z"), ("Y", "Z"), ("Z", "W")])
 
-        # Still blocked without conditioning
-        self.assertTrue(is_d_separated(G, "X", "Y", set()))
+@functools.lru_cache(maxsize=None)
+def cached_dag(edges):
+    """Build each motif graph once; identical edge tuples share a graph.
 
-        # Conditioning on descendant of collider opens
-        self.assertFalse(is_d_separated(G, "X", "Y", {"W"}))
+    Safe because is_d_separated never mutates its input.
+    """
+    return _TinyDAG(edges)
 
-    # Degenerate / semantics-locking tests (for moralization+delete-Z implementation) 
 
-    def test_condition_on_endpoint_makes_trivially_separated_in_this_implementation(self):
-        # With the "moralize then delete Z nodes" implementation,
-        # conditioning on an endpoint removes it from the graph, so no path can exist.
-        G = dag([("X", "Z"), ("Z", "Y")])
-        self.assertTrue(is_d_separated(G, "X", "Y", {"Y"}))
-        self.assertTrue(is_d_separated(G, "X", "Y", {"X"}))
-
-    def test_start_equals_end_not_separated(self):
-        G = dag([("X", "Y")])
-        self.assertFalse(is_d_separated(G, "X", "X", set()))
-        self.assertFalse(is_d_separated(G, "X", "X", {"Y"}))
-
-    def test_missing_nodes_treated_as_separated(self):
-        G = dag([("A", "B")])
-        self.assertTrue(is_d_separated(G, "X", "B", set()))
-        self.assertTrue(is_d_separated(G, "A", "Y", {"B"}))
-
-    #  Multiple paths / robustness 
-
-    def test_two_chains_condition_blocks_one_but_other_keeps_dependence(self):
-        # X -> Z -> Y and X -> W -> Y (two active chain paths)
-        G = dag([("X", "Z"), ("Z", "Y"), ("X", "W"), ("W", "Y")])
-
-        # Unconditioned: dependent
-        self.assertFalse(is_d_separated(G, "X", "Y", set()))
+CHAIN = (("X", "Z"), ("Z", "Y"))
+FORK = (("Z", "X"), ("Z", "Y"))
+COLLIDER = (("X", "Z"), ("Y", "Z"))
+COLLIDER_DESC = (("X", "Z"), ("Y", "Z"), ("Z", "W"))
+TWO_CHAINS = (("X", "Z"), ("Z", "Y"), ("X", "W"), ("W", "Y"))
+DISCONNECTED = (("X", "Z"), ("Z", "Y"), ("U", "V"))
+COLLIDER_SIDE = (("X", "Z"), ("Y", "Z"), ("X", "W"))
+ANCESTOR = (("X", "Z"), ("Z", "Y"), ("Z", "W"), ("A", "W"))
 
-        # Conditioning on Z blocks only that path; W path remains
-        self.assertFalse(is_d_separated(G, "X", "Y", {"Z"}))
 
-        # Conditioning on both middle nodes blocks both paths
-        self.assertTrue(is_d_separated(G, "X", "Y", {"Z", "W"}))
-
-    def test_irrelevant_conditioning_in_disconnected_component_does_not_change_result(self):
-        # X -> Z -> Y is one component; U -> V is disconnected
-        G = dag([("X", "Z"), ("Z", "Y"), ("U", "V")])
-
-        self.assertFalse(is_d_separated(G, "X", "Y", set()))
-        self.assertFalse(is_d_separated(G, "X", "Y", {"U"}))
-        self.assertFalse(is_d_separated(G, "X", "Y", {"V"}))
-        self.assertFalse(is_d_separated(G, "X", "Y", {"U", "V"}))
-
-    def test_condition_on_non_descendant_of_collider_does_not_open(self):
-        # Collider: X -> Z <- Y, plus X -> W (W is NOT a descendant of Z)
-        G = dag([("X", "Z"), ("Y", "Z"), ("X", "W")])
-
-        # Unconditioned: blocked by collider
-        self.assertTrue(is_d_separated(G, "X", "Y", set()))
-
-        # Conditioning on W should NOT open collider path
-        self.assertTrue(is_d_separated(G, "X", "Y", {"W"}))
-
-    def test_ancestor_restriction_irrelevant_parents_of_descendant_do_not_matter(self):
-        # X -> Z -> Y, Z -> W, and A -> W (A is not an ancestor of X or Y)
-        # Conditioning on W should not change X-Z-Y chain unless it creates a collider situation (it doesn't here).
-        G = dag([("X", "Z"), ("Z", "Y"), ("Z", "W"), ("A", "W")])
-
-        # Unconditioned: X and Y dependent via chain
+class TestDSeparation(unittest.TestCase):
+    # One row per is_d_separated query: (edges, X, Y, Z, expected).
+    CASES = (
+        # Chain X -> Z -> Y: active unconditioned, blocked by the middle
+        (CHAIN, "X", "Y", frozenset(), False),
+        (CHAIN, "X", "Y", frozenset({"Z"}), True),
+
+        # Fork Z -> X, Z -> Y: active unconditioned, blocked by common cause
+        (FORK, "X", "Y", frozenset(), False),
+        (FORK, "X", "Y", frozenset({"Z"}), True),
+
+        # Collider X -> Z <- Y: blocked unconditioned, opened by Z
+        (COLLIDER, "X", "Y", frozenset(), True),
+        (COLLIDER, "X", "Y", frozenset({"Z"}), False),
+
+        # ... and opened by conditioning on a descendant of the collider
+        (COLLIDER_DESC, "X", "Y", frozenset(), True),
+        (COLLIDER_DESC, "X", "Y", frozenset({"W"}), False),
+
+        # Degenerate / semantics-locking (moralize-then-delete-Z):
+        # conditioning on an endpoint removes it, so no path can exist
+        (CHAIN, "X", "Y", frozenset({"Y"}), True),
+        (CHAIN, "X", "Y", frozenset({"X"}), True),
+
+        # start == end is never separated
+        ((("X", "Y"),), "X", "X", frozenset(), False),
+        ((("X", "Y"),), "X", "X", frozenset({"Y"}), False),
+
+        # missing nodes are treated as separated
+        ((("A", "B"),), "X", "B", frozenset(), True),
+        ((("A", "B"),), "A", "Y", frozenset({"B"}), True),
+
+        # Two chain paths: conditioning must block both
+        (TWO_CHAINS, "X", "Y", frozenset(), False),
+        (TWO_CHAINS, "X", "Y", frozenset({"Z"}), False),
+        (TWO_CHAINS, "X", "Y", frozenset({"Z", "W"}), True),
+
+        # Conditioning in a disconnected component changes nothing
+        (DISCONNECTED, "X", "Y", frozenset(), False),
+        (DISCONNECTED, "X", "Y", frozenset({"U"}), False),
+        (DISCONNECTED, "X", "Y", frozenset({"V"}), False),
+        (DISCONNECTED, "X", "Y", frozenset({"U", "V"}), False),
+
+        # Conditioning on a non-descendant of the collider does not open it
+        (COLLIDER_SIDE, "X", "Y", frozenset(), True),
+        (COLLIDER_SIDE, "X", "Y", frozenset({"W"}), True),
+
+        # Ancestor restriction: irrelevant parents of a descendant don't
+        # matter, and conditioning on W doesn't block the X-Z-Y chain
+        (ANCESTOR, "X", "Y", frozenset(), False),
+        (ANCESTOR, "X", "Y", frozenset({"W"}), False),
+        (ANCESTOR, "X", "Y", frozenset({"Z"}), True),
+    )
+
+    def test_all_motifs(self):
+        for edges, a, b, Z, expected in self.CASES:
+            with self.subTest(edges=edges, a=a, b=b, Z=set(Z)):
+                self.assertEqual(
+                    is_d_separated(cached_dag(edges), a, b, set(Z)),
+                    expected,
+                )
+
+    # NetworkX integration: one motif re-checked on a real DiGraph so the
+    # table above can safely run against the _TinyDAG double.
+
+    def test_networkx_digraph_integration(self):
+        G = dag([("X", "Z"), ("Z", "Y")])
         self.assertFalse(is_d_separated(G, "X", "Y", set()))
-
-        # Conditioning on W (a descendant of Z, but not a collider-descendant scenario for X-Y) shouldn't block the chain
-        self.assertFalse(is_d_separated(G, "X", "Y", {"W"}))
-
-        # Conditioning on Z still blocks the chain
         self.assertTrue(is_d_separated(G, "X", "Y", {"Z"}))
 
-    # Symmetry 
+    # Symmetry
 
     def test_symmetry(self):
         G = dag([("X", "Z"), ("Z", "Y"), ("U", "X")])
@@ -132,4 +159,4 @@ class TestDSeparation(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -3,81 +3,92 @@ import sympy as sp
 
 from probability import CausalProbability, Do, Mult 
 from probability import SumOver
+from _helpers import _P, _do
+
+X, Y, Z, V2 = sp.symbols("X Y Z V2")
+
+
+def has_do(expr, sym, val=None):
+    """Structural check for a Do(sym[, val]) condition on expr — avoids
+    stringifying the whole tree just to substring-match 'do(...)'."""
+    for c in expr.args[1:]:
+        if isinstance(c, Do) and c.args[0] == sym:
+            if val is None or (len(c.args) == 2 and c.args[1] == val):
+                return True
+    return False
 
 
 class TestProbability(unittest.TestCase):
 
     def test_parse_marginal(self):
-        expr = CausalProbability.parse("P(Y)")
+        expr = _P("P(Y)")
         self.assertIsInstance(expr, CausalProbability)
         self.assertEqual(str(expr), "P(Y)")
 
     def test_parse_conditional_symbol(self):
-        expr = CausalProbability.parse("P(Y|X)")
+        expr = _P("P(Y|X)")
         self.assertIsInstance(expr, CausalProbability)
         self.assertEqual(str(expr), "P(Y | X)")
 
     def test_parse_assignments(self):
-        expr = CausalProbability.parse("P(Y=1|X=0)")
+        expr = _P("P(Y=1|X=0)")
         self.assertIsInstance(expr, CausalProbability)
         self.assertIn("Y=1", str(expr))
         self.assertIn("X=0", str(expr))
 
     def test_parse_do_no_value(self):
-        expr = CausalProbability.parse("P(Y|do(X))")
+        expr = _P("P(Y|do(X))")
         self.assertIsInstance(expr, CausalProbability)
         # do(X) should appear
-        self.assertIn("do(X)", str(expr))
+        self.assertTrue(has_do(expr, X))
 
     def test_parse_do_with_value(self):
-        expr = CausalProbability.parse("P(Y=1|do(X=0))")
+        expr = _P("P(Y=1|do(X=0))")
         self.assertIsInstance(expr, CausalProbability)
-        self.assertIn("Y=1", str(expr))
-        self.assertIn("do(X=0)", str(expr))
+        self.assertEqual(expr.args[0], sp.Eq(Y, 1))
+        self.assertTrue(has_do(expr, X, 0))
 
     def test_parse_do_multiple_vars(self):
-        expr = CausalProbability.parse("P(Y|do(X, V2))")
+        expr = _P("P(Y|do(X, V2))")
         self.assertIsInstance(expr, CausalProbability)
-        s = str(expr)
-        self.assertIn("do(X)", s)
-        self.assertIn("do(V2)", s)
+        self.assertTrue(has_do(expr, X))
+        self.assertTrue(has_do(expr, V2))
 
     def test_parse_subscript_do(self):
-        expr = CausalProbability.parse("P(Y_{X=1, V2=0})")
+        expr = _P("P(Y_{X=1, V2=0})")
         self.assertIsInstance(expr, CausalProbability)
-        s = str(expr)
-        self.assertIn("P(Y", s)
-        self.assertIn("do(X=1)", s)
-        self.assertIn("do(V2=0)", s)
+        self.assertEqual(expr.args[0], Y)
+        self.assertTrue(has_do(expr, X, 1))
+        self.assertTrue(has_do(expr, V2, 0))
 
     def test_order_insensitive_conditions(self):
-        a = CausalProbability.parse("P(Y | do(X), V2)")
-        b = CausalProbability.parse("P(Y | V2, do(X))")
+        a = _P("P(Y | do(X), V2)")
+        b = _P("P(Y | V2, do(X))")
         self.assertEqual(a, b)
         self.assertEqual(hash(a), hash(b))
         self.assertEqual(str(a), str(b))
 
     def test_order_insensitive_multiple(self):
-        a = CausalProbability.parse("P(Y | do(X), do(V2), Z)")
-        b = CausalProbability.parse("P(Y | Z, do(V2), do(X))")
+        a = _P("P(Y | do(X), do(V2), Z)")
+        b = _P("P(Y | Z, do(V2), do(X))")
         self.assertEqual(a, b)
         self.assertEqual(str(a), str(b))
 
     def test_hashable_content_stable(self):
-        a = CausalProbability.parse("P(Y | do(X), Z)")
+        a = _P("P(Y | do(X), Z)")
         # should be usable as dict key
         d = {a: 1}
-        b = CausalProbability.parse("P(Y | Z, do(X))")
+        b = _P("P(Y | Z, do(X))")
         self.assertEqual(d[b], 1)
 
     def test_product_parsing_mult(self):
-        expr = CausalProbability.parse("P(A|B) * P(B)")
+        expr = _P("P(A|B) * P(B)")
         self.assertTrue(isinstance(expr, (Mult, sp.Mul)))       
         self.assertEqual(len(expr.args), 2)
         self.assertTrue(all(isinstance(arg, CausalProbability) for arg in expr.args))
 
     def test_arithmetic_parsing_difference(self):
-        expr = CausalProbability.parse("P(Y_{X=1}) - P(Y_{X=0})")
+        expr = _P("P(Y_{X=1}) - P(Y_{X=0})")
         self.assertIsInstance(expr, sp.Expr)
         s = str(expr)
         self.assertIn("P(Y", s)
@@ -85,25 +96,31 @@ class TestProbability(unittest.TestCase):
         self.assertIn("do(X=0)", s)
 
     def test_arithmetic_parsing_mixture(self):
-        expr = CausalProbability.parse("P(Y_{X=1}) - P(Y_{X=0}) + P(Z)")
+        expr = _P("P(Y_{X=1}) - P(Y_{X=0}) + P(Z)")
         self.assertIsInstance(expr, sp.Expr)
         s = str(expr)
         self.assertIn("P(Z)", s)
 
+    def test_arithmetic_parsing_numeric_literals(self):
+        # Numbers in non-leading positions: the token walk must advance
+        # its cursor past them without dropping the remaining terms.
+        expr = _P("P(Y) - 2 + P(Z)")
+        self.assertEqual(str(expr), "-2 + P(Y) + P(Z)")
+
+        expr = _P("0.5*P(Y) + 0.5*P(Z)")
+        self.assertEqual(str(expr), "0.5*P(Y) + 0.5*P(Z)")
+
     def test_do_object_string(self):
-        X = sp.Symbol("X")
-        self.assertEqual(str(Do(X)), "do(X)")
-        self.assertEqual(str(Do(X, 0)), "do(X=0)")
+        self.assertEqual(str(_do(X)), "do(X)")
+        self.assertEqual(str(_do(X, 0)), "do(X=0)")
 
     def test_sumover_basic(self):
-        Y, X, Z = sp.symbols("Y X Z")
         inner = CausalProbability(Y, X, Z) * CausalProbability(Z)
         expr = SumOver(Z, inner)
         self.assertIn("Σ", str(expr))
         self.assertIn("Z", str(expr))
     
     def test_sumover_composes(self):
-        Y, X, Z = sp.symbols("Y X Z")
         inner = CausalProbability(Y, X, Z) * CausalProbability(Z)
         expr = SumOver(Z, inner)
         combined = expr + expr